@@ -1,4 +1,7 @@
 import warnings
+import os
+import hashlib
+import tempfile
 from bids import BIDSLayout
 from bids.layout.models import BIDSImageFile
 import numpy as np
@@ -298,13 +301,17 @@ class BIDSLoader():
         return full_dict
 
     @staticmethod
-    def load_image_tuple(image_tuple: tuple, dtype=np.float32):
+    def load_image_tuple(image_tuple: tuple, dtype=np.float32, cache_dir: str = None):
         '''
         Loads the tuple and returns it in an array
         Parameters
         ----------
         image_tuple : tuple (BIDSImageFile,)
             Tuple of BIDSImageFile to be loaded and returned in an array
+        dtype
+            Optional. Data type of the returned array. If bool, the images are packed with np.packbits.
+        cache_dir : str
+            Optional. If dtype is bool, directory in which to cache the packed images. Default: None (no caching)
         Returns
         -------
         np.array
@@ -314,17 +321,83 @@ class BIDSLoader():
         if(dtype is not bool):
             data = np.zeros((len(image_tuple), *data_shape), dtype=dtype)
             for idx, im in enumerate(image_tuple):
-                data[idx, ...] = np.array(im.get_image().get_fdata(), dtype=dtype)
+                BIDSLoader._load_image_into(im, data[idx, ...])
         else:
             num_bytes = int(np.ceil(np.prod(data_shape)/8))
             data = np.zeros((len(image_tuple), num_bytes), dtype=np.uint8)
             for idx, im in enumerate(image_tuple):
-                tmp_dat = np.array(im.get_image().get_fdata(), dtype=dtype)
-                data[idx, ...] = np.packbits(tmp_dat)
+                data[idx, ...] = BIDSLoader.load_packed_image(im, cache_dir=cache_dir)
         return data
 
     @staticmethod
-    def load_image_tuple_list(image_list: list, dtype=np.float32):
+    def _load_image_into(image: BIDSImageFile, out: np.array):
+        '''
+        Loads the image directly into a preallocated array. The data is read at the dtype stored in the file (after
+        scaling) and cast on assignment, avoiding the float64 copy of the volume made by get_fdata.
+        Parameters
+        ----------
+        image : BIDSImageFile
+            Image to load.
+        out : np.array
+            Array in which to write the image data; must have the same shape as the image.
+
+        Returns
+        -------
+        None
+        '''
+        out[...] = np.asanyarray(image.get_image().dataobj)
+        return
+
+    @staticmethod
+    def load_packed_image(image: BIDSImageFile, cache_dir: str = None):
+        '''
+        Loads the image as a boolean mask packed with np.packbits. If cache_dir is specified, the packed mask is saved
+        there as a .npy file and memory-mapped on subsequent calls, skipping the decompression of the image. Cache
+        entries are keyed on the path, size and modification time of the image, so replacing the image invalidates
+        its entry.
+        Parameters
+        ----------
+        image : BIDSImageFile
+            Image to load.
+        cache_dir : str
+            Optional. Directory in which to cache the packed image. Default: None (no caching)
+
+        Returns
+        -------
+        np.array
+            np.uint8 array containing the packed image.
+        '''
+        if(cache_dir is not None):
+            # Hash the full path; filenames can be identical between datasets (e.g. train and test). Size and mtime
+            # are included because extracted archives can restore timestamps older than the existing cache entry.
+            image_stat = os.stat(image.path)
+            cache_key = f'{os.path.abspath(image.path)}:{image_stat.st_size}:{image_stat.st_mtime_ns}'
+            cache_name = hashlib.sha256(cache_key.encode()).hexdigest() + '.npy'
+            cache_path = os.path.join(cache_dir, cache_name)
+            if(os.path.exists(cache_path)):
+                try:
+                    return np.load(cache_path, mmap_mode='r')
+                except (ValueError, EOFError, OSError):
+                    # Unreadable cache entry (e.g. truncated); rebuild it below
+                    warnings.warn(f'Cached target {cache_path} is corrupted; rebuilding it.')
+        packed = np.packbits(np.asanyarray(image.get_image().dataobj).astype(bool, copy=False))
+        if(cache_dir is not None):
+            tmp_path = None
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # Write to a temporary file first so that an interrupted write never leaves a partial cache entry
+                with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.npy.tmp', delete=False) as tmp_file:
+                    tmp_path = tmp_file.name
+                    np.save(tmp_file, packed)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                warnings.warn(f'Unable to write to cache directory {cache_dir}; targets will not be cached.')
+                if(tmp_path is not None and os.path.exists(tmp_path)):
+                    os.remove(tmp_path)
+        return packed
+
+    @staticmethod
+    def load_image_tuple_list(image_list: list, dtype=np.float32, cache_dir: str = None):
         '''
         Loads each image in the tuple and returns in a single array; different tuples in the list are assumed to be
         batches. The returned array will be of shape (len(image_list), len(image_tuple), *image.shape
@@ -332,6 +405,10 @@ class BIDSLoader():
         ----------
         image_list : list [tuple]
             List of tuples containing BIDSImageFile
+        dtype
+            Optional. Data type of the returned array. If bool, the images are packed with np.packbits.
+        cache_dir : str
+            Optional. If dtype is bool, directory in which to cache the packed images. Default: None (no caching)
 
         Returns
         -------
@@ -343,15 +420,16 @@ class BIDSLoader():
         data_shape = image_list[0][0].get_image().shape
         if(dtype is not bool):
             data = np.zeros((num_batch, num_dim, *data_shape), dtype=dtype)
+            # Write each image directly into the batch rather than through a per-tuple array
             for idx, image_tuple in enumerate(image_list):
-                data[idx, ...] = BIDSLoader.load_image_tuple(
-                    image_tuple, dtype=dtype)
+                for dim_idx, im in enumerate(image_tuple):
+                    BIDSLoader._load_image_into(im, data[idx, dim_idx, ...])
         else:
             num_bytes = int(np.ceil(np.prod(data_shape)/8))
             data = np.zeros((num_batch, num_dim, num_bytes), dtype=np.uint8)
             for idx, image_tuple in enumerate(image_list):
-                data[idx, ...] = BIDSLoader.load_image_tuple(
-                    image_tuple, dtype=dtype)
+                for dim_idx, im in enumerate(image_tuple):
+                    data[idx, dim_idx, ...] = BIDSLoader.load_packed_image(im, cache_dir=cache_dir)
         return data
 
     def load_sample(self, idx: int):
@@ -381,9 +459,9 @@ class BIDSLoader():
             dtype=np.float32)
 
         for point_idx, point in enumerate(self.data_list[idx]):
-            data[point_idx, ...] = point.get_image().get_fdata()
+            self._load_image_into(point, data[point_idx, ...])
         for point_idx, point in enumerate(self.target_list[idx]):
-            target[point_idx, ...] = point.get_image().get_fdata()
+            self._load_image_into(point, target[point_idx, ...])
         return data, target
 
     def __len__(self):
@@ -411,6 +489,10 @@ class BIDSLoader():
                            *self.target_shape),
                           dtype=np.float32)
 
+        # Fill the batch in place instead of copying from per-sample arrays
         for i, idx in enumerate(indices):
-            data[i, ...], target[i, ...] = self.load_sample(idx)
+            for point_idx, point in enumerate(self.data_list[idx]):
+                self._load_image_into(point, data[i, point_idx, ...])
+            for point_idx, point in enumerate(self.target_list[idx]):
+                self._load_image_into(point, target[i, point_idx, ...])
         return data, target
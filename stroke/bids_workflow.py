@@ -1,5 +1,6 @@
 from rampwf.utils.importing import import_module_from_source
 import os
+from concurrent.futures import ThreadPoolExecutor
 from stroke import stroke_config
 from stroke.bids_loader import BIDSLoader
 
@@ -53,7 +54,7 @@ class BIDSWorkflow():
         '''
 
         if(train_is is None):
-            train_is = slice(None, None, None)
+            train_is = range(len(X_array))
 
         batch_size = stroke_config.training['batch_size']
         estimator_module = import_module_from_source(
@@ -64,19 +65,50 @@ class BIDSWorkflow():
             sanitize=True)
         self.estimator = estimator_module.BIDSEstimator()
 
-        for idx in range(0, len(train_is), batch_size):
-            # Get tuples to load
-            data_to_load = [X_array[i] for i in train_is[idx:idx + batch_size]]
-            target_to_load = [y_array[i]
-                              for i in train_is[idx:idx + batch_size]]
-            # Load data
-            data = BIDSLoader.load_image_tuple_list(data_to_load)
-            target = BIDSLoader.load_image_tuple_list(target_to_load, dtype=stroke_config.data_types['target'])
-
-            # Fit
-            self.estimator.fit_partial(data, target)
+        # Load the next batch in a background thread while the estimator is fit on the current one
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            if(len(train_is) > 0):
+                next_batch = executor.submit(self._load_batch, X_array, y_array, train_is[0:batch_size])
+            for idx in range(0, len(train_is), batch_size):
+                data, target = next_batch.result()
+                if(idx + batch_size < len(train_is)):
+                    next_batch = executor.submit(self._load_batch, X_array, y_array,
+                                                 train_is[idx + batch_size:idx + 2 * batch_size])
+                # Fit
+                self.estimator.fit_partial(data, target)
         return self.estimator
 
+    @staticmethod
+    def _load_batch(X_array: list,
+                    y_array: list,
+                    batch_is: list):
+        '''
+        Loads the data and target for a batch of training samples.
+        Parameters
+        ----------
+        X_array : list
+            List of BIDSImage tuples corresponding to the data.
+        y_array : list
+            List of BIDSImage tuples corresponding to the labels.
+        batch_is : list
+            List of indices indicating the entries in X_array to load.
+
+        Returns
+        -------
+        np.array
+            Data for the batch.
+        np.array
+            Target for the batch.
+        '''
+        # Get tuples to load
+        data_to_load = [X_array[i] for i in batch_is]
+        target_to_load = [y_array[i] for i in batch_is]
+        # Load data
+        data = BIDSLoader.load_image_tuple_list(data_to_load)
+        target = BIDSLoader.load_image_tuple_list(target_to_load, dtype=stroke_config.data_types['target'],
+                                                  cache_dir=stroke_config.cache_dir)
+        return data, target
+
     def test_submission(self,
                         trained_estimator,
                         X_array: list):
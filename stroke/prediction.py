@@ -1,6 +1,7 @@
 from stroke.bids_loader import BIDSLoader
 from stroke import stroke_config
 import numpy as np
+from joblib import Parallel, delayed
 from rampwf.prediction_types.base import BasePrediction
 
 import bids
@@ -35,12 +36,15 @@ class BIDSPrediction(BasePrediction):
         if(y_true is not None):
             if(fold_is is not None):
                 y_true = [y_true[i] for i in fold_is]
+            # Decompression releases the GIL, so the targets can be loaded in parallel threads
+            y_true_list = Parallel(n_jobs=stroke_config.n_jobs, prefer='threads')(
+                delayed(BIDSLoader.load_image_tuple)(y, dtype=stroke_config.data_types['target'],
+                                                     cache_dir=stroke_config.cache_dir)
+                for y in y_true)
             if(stroke_config.data_types['target'] is not bool):
-                self.y_true = np.array([BIDSLoader.load_image_tuple(y, dtype=stroke_config.data_types['target'])
-                                   for y in y_true], dtype=stroke_config.data_types['target'])
+                self.y_true = np.array(y_true_list, dtype=stroke_config.data_types['target'])
             else:
-                self.y_true = np.array([BIDSLoader.load_image_tuple(y, dtype=stroke_config.data_types['target'])
-                                        for y in y_true], dtype=np.uint8)
+                self.y_true = np.array(y_true_list, dtype=np.uint8)
         else:
             self.y_true = []
 
@@ -1,6 +1,66 @@
 import numpy as np
 from stroke.bids_loader import BIDSLoader
 
+try:
+    import numba
+except ImportError:
+    # numba is optional; binary masks fall back to NumPy reductions
+    numba = None
+
+try:
+    import cupy
+except ImportError:
+    # cupy is optional; only needed if the estimator returns predictions on the GPU
+    cupy = None
+
+
+if(numba is not None):
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _dice_kernel(array_0, array_1):
+        '''
+        Computes the overlap and the number of positives of two flat uint8 masks in a single parallel pass.
+        Parameters
+        ----------
+        array_0 : np.array
+            First contiguous, 1-D uint8 array.
+        array_1 : np.array
+            Second contiguous, 1-D uint8 array.
+
+        Returns
+        -------
+        tuple
+            Tuple containing (sum(array_0 & array_1), sum(array_0), sum(array_1))
+        '''
+        overlap = 0
+        sum0 = 0
+        sum1 = 0
+        for i in numba.prange(array_0.size):
+            overlap += array_0[i] & array_1[i]
+            sum0 += array_0[i]
+            sum1 += array_1[i]
+        return overlap, sum0, sum1
+else:
+    _dice_kernel = None
+
+
+def _as_u8(array_0: np.array):
+    '''
+    Returns a contiguous uint8 version of a binary mask. Boolean arrays share the layout of uint8 and are viewed
+    without copying; other dtypes are cast.
+    Parameters
+    ----------
+    array_0 : np.array
+        Mask to convert.
+
+    Returns
+    -------
+    np.array
+        Contiguous np.uint8 array.
+    '''
+    if(array_0.dtype == bool):
+        return np.ascontiguousarray(array_0).view(np.uint8)
+    return np.ascontiguousarray(array_0, dtype=np.uint8)
+
 
 class DiceCoeff():
     def __init__(self,
@@ -49,7 +109,7 @@ class DiceCoeff():
         dice_coefficient : float
             Sørensen–Dice coefficient.
         '''
-        y_true = np.array(Y_true.y_true)
+        y_true = np.asarray(Y_true.y_true)
         if(len(Y_pred.y_pred) == 0):
             return 0
         estimator = Y_pred.y_pred[0].estimator
@@ -71,9 +131,8 @@ class DiceCoeff():
             # Note: If you want to get the weighted mean, use
             # self.calc_score_parts
             if(must_unpack):
-                unpacked_y_sample = np.array(self.unpack_data(y_true[idx, ...], dat.shape), dtype=dat.dtype)
-                # unpacked_y_sample = np.array(np.unpackbits(y_true[idx, ...]), dtype=dat.dtype)
-                unpacked_y_sample = unpacked_y_sample.reshape(dat.shape)
+                # Keep the target as a 1-byte mask rather than casting it to the prediction's dtype
+                unpacked_y_sample = self.unpack_data(y_true[idx, ...], dat.shape).view(bool)
                 sd_score = self.calc_score(dat, unpacked_y_sample)
             else:
                 sd_score = self.calc_score(dat, y_true[idx, ...])
@@ -99,9 +158,8 @@ class DiceCoeff():
         np.array
             Unpacked, reshape array
         '''
-        unpack_shape = np.prod(array_0.shape)*8
-        extra_entries = unpack_shape - np.prod(output_shape)
-        return np.unpackbits(array_0)[:-extra_entries].reshape(output_shape)
+        # Only unpack the bits that are needed; excess bytes are never expanded
+        return np.unpackbits(np.ravel(array_0), count=int(np.prod(output_shape))).reshape(output_shape)
 
 
     @staticmethod
@@ -125,6 +183,9 @@ class DiceCoeff():
         # NOTE: This computation of the coefficient allows for continuous
         # values in the prediction.
         overlap, sum0, sum1 = DiceCoeff.calc_score_parts(array_0, array_1)
+        if(sum0 + sum1 == 0):
+            # Both images are empty; they agree perfectly
+            return 1.0
         sorenson = overlap / (sum0 + sum1)
         return sorenson
 
@@ -143,10 +204,62 @@ class DiceCoeff():
         tuple
             Tuple containing (overlap, sum(array_0), sum(array_1)
         '''
-        array_0_reshape = np.reshape(array_0, (1, np.prod(array_0.shape)))
-        array_1_reshape = np.reshape(array_1, (np.prod((array_1.shape)), 1))
-        overlap = 2 * array_0_reshape @ array_1_reshape
-        return (overlap[0][0], np.sum(array_0), np.sum(array_1))
+        if(cupy is not None and isinstance(array_0, cupy.ndarray)):
+            # Prediction is already on the GPU; score it there instead of copying the volume back to the host
+            return DiceCoeff._calc_score_parts_gpu(array_0, array_1)
+        # ravel returns a view for contiguous arrays; avoids the copies made by the (1, N) @ (N, 1) product
+        flat_0 = np.ravel(array_0)
+        flat_1 = np.ravel(array_1)
+        if(DiceCoeff.check_binary_mask(flat_0) and DiceCoeff.check_binary_mask(flat_1)):
+            # Binary masks: reduce on 1-byte views instead of promoting the whole volume to float. Accumulate in
+            # int64 to avoid overflowing uint8.
+            flat_0 = _as_u8(flat_0)
+            flat_1 = _as_u8(flat_1)
+            if(_dice_kernel is not None):
+                overlap, sum0, sum1 = _dice_kernel(flat_0, flat_1)
+                return (2 * overlap, sum0, sum1)
+            # Entries are 0 or 1, so counting non-zero entries is equivalent to summing, without any float temporary
+            overlap = 2 * np.count_nonzero(flat_0 & flat_1)
+            return (overlap, np.count_nonzero(flat_0), np.count_nonzero(flat_1))
+        if(np.result_type(flat_0, flat_1).kind in 'biu'):
+            # np.dot accumulates in the input dtype; widen integer labels to avoid overflowing the overlap
+            overlap = 2 * np.dot(flat_0, flat_1.astype(np.int64))
+        else:
+            overlap = 2 * np.dot(flat_0, flat_1)
+        return (overlap, np.sum(flat_0), np.sum(flat_1))
+
+    @staticmethod
+    def _calc_score_parts_gpu(array_0,
+                              array_1):
+        '''
+        GPU counterpart of calc_score_parts for predictions returned as cupy arrays.
+        Parameters
+        ----------
+        array_0 : cupy.ndarray
+            First array; must be on the GPU.
+        array_1
+            Second array; copied to the GPU if it is on the host.
+
+        Returns
+        -------
+        tuple
+            Tuple containing (overlap, sum(array_0), sum(array_1)
+        '''
+        flat_0 = cupy.ravel(array_0)
+        flat_1 = cupy.ravel(cupy.asarray(array_1))
+        if(flat_0.dtype == bool and flat_1.dtype == bool):
+            overlap = 2 * cupy.count_nonzero(flat_0 & flat_1)
+            sum0 = cupy.count_nonzero(flat_0)
+            sum1 = cupy.count_nonzero(flat_1)
+        else:
+            if(flat_0.dtype.kind in 'biu' and flat_1.dtype.kind in 'biu'):
+                # Widen integer labels so that the product doesn't overflow, as in calc_score_parts
+                flat_1 = flat_1.astype(np.int64)
+            overlap = 2 * cupy.sum(flat_0 * flat_1)
+            sum0 = cupy.sum(flat_0)
+            sum1 = cupy.sum(flat_1)
+        # Only the three scalars are copied back to the host
+        return (overlap.item(), sum0.item(), sum1.item())
 
     @staticmethod
     def check_y_pred_dimensions(array_0: np.array,
@@ -168,3 +281,27 @@ class DiceCoeff():
             return False
         else:
             return True
+
+    @staticmethod
+    def check_binary_mask(array_0: np.array):
+        '''
+        Checks whether the input is an integer or boolean mask containing only 0 and 1. Floating point inputs are
+        treated as continuous predictions and are never considered binary.
+        Parameters
+        ----------
+        array_0 : np.array
+            Array to check.
+
+        Returns
+        -------
+        bool
+        '''
+        if(array_0.dtype == bool):
+            return True
+        elif(array_0.dtype.kind == 'u'):
+            # Single comparison pass; no temporary for the set of valid values
+            return not np.any(array_0 > 1)
+        elif(array_0.dtype.kind == 'i'):
+            return not np.any((array_0 < 0) | (array_0 > 1))
+        else:
+            return False
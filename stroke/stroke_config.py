@@ -10,6 +10,10 @@ data_path = 'data/'
 # Data
 data_types = {'data': np.float32,
               'target': bool}
+# Packed boolean targets are cached here to avoid decompressing the masks each time they're loaded. None disables it.
+cache_dir = join(data_path, 'cache')
+# Number of threads used to load targets. Each thread holds a full decoded volume; -1 uses one thread per core.
+n_jobs = 4
 
 training = {'batch_size': 5,
             'dir_name': join(data_path, 'train'),
@@ -78,6 +78,8 @@ class BIDSEstimator(BaseEstimator):
         '''
             Applies the data to the estimator to produce a prediction. The output type is expected to match the problem.
             I.e., classification problems should have categorical predictions. Required.
+            Thresholded masks should be returned as bool (e.g. y_proba > 0.5) rather than multiplied into int or float
+            arrays; boolean masks are scored without being promoted to a wider type.
             This estimator always returns 1.
             Parameters
             ----------
@@ -1,6 +1,9 @@
 from bids_loader import BIDSLoader
 import unittest
 import os
+import tempfile
+import numpy as np
+import nibabel as nib
 import bids
 bids.config.set_option(
     'extension_initial_dot',
@@ -268,3 +271,72 @@ class TestBIDSLoader(unittest.TestCase):
         target = bdc.load_image_tuple(bdc.target_list[0])
         self.assertEqual(target.shape, (1, 1, 1, 1))
         self.assertEqual(target[0], 1)
+
+    def test_load_tuple_cache(self):
+        test_directory = os.path.dirname(__file__)
+        root_dir = os.path.join(test_directory, 'bids_sample/train')
+        bdc = BIDSLoader(root_dir=root_dir,
+                         data_entities=[{'suffix': 'T1w',
+                                         'session': '',
+                                         'subject': ''}],
+                         target_entities=[{'suffix': 'FLAIR'}],
+                         target_derivatives_names=['test1'])
+        with tempfile.TemporaryDirectory() as cache_dir:
+            target = bdc.load_image_tuple(bdc.target_list[0], dtype=bool, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            cached_target = bdc.load_image_tuple(bdc.target_list[0], dtype=bool, cache_dir=cache_dir)
+        self.assertEqual(target.dtype, np.uint8)
+        self.assertTrue(np.array_equal(target, cached_target))
+        self.assertTrue(np.array_equal(target, bdc.load_image_tuple(bdc.target_list[0], dtype=bool)))
+        return
+
+    def test_load_tuple_cache_corrupted(self):
+        test_directory = os.path.dirname(__file__)
+        root_dir = os.path.join(test_directory, 'bids_sample/train')
+        bdc = BIDSLoader(root_dir=root_dir,
+                         data_entities=[{'suffix': 'T1w',
+                                         'session': '',
+                                         'subject': ''}],
+                         target_entities=[{'suffix': 'FLAIR'}],
+                         target_derivatives_names=['test1'])
+        expected_target = bdc.load_image_tuple(bdc.target_list[0], dtype=bool)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            bdc.load_image_tuple(bdc.target_list[0], dtype=bool, cache_dir=cache_dir)
+            # Only the final cache entry should be left behind; no temporary files
+            cache_files = os.listdir(cache_dir)
+            self.assertEqual(len(cache_files), 1)
+            cache_path = os.path.join(cache_dir, cache_files[0])
+            # Truncate the cached file, as an interrupted write would
+            with open(cache_path, 'r+b') as f:
+                f.truncate(10)
+            with self.assertWarns(UserWarning):
+                target = bdc.load_image_tuple(bdc.target_list[0], dtype=bool, cache_dir=cache_dir)
+            self.assertTrue(np.array_equal(target, expected_target))
+            # The entry is rebuilt and can be read from the cache again
+            self.assertTrue(np.array_equal(np.load(cache_path), expected_target[0]))
+            target = bdc.load_image_tuple(bdc.target_list[0], dtype=bool, cache_dir=cache_dir)
+            self.assertTrue(np.array_equal(target, expected_target))
+        return
+
+    def test_load_packed_image_replaced(self):
+        class ImageFile():
+            # Stand-in for BIDSImageFile
+            def __init__(self, path):
+                self.path = path
+
+            def get_image(self):
+                return nib.load(self.path)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            image_path = os.path.join(tmp_dir, 'mask.nii.gz')
+            nib.save(nib.Nifti1Image(np.ones((3, 3, 3), dtype=np.uint8), np.eye(4)), image_path)
+            image = ImageFile(image_path)
+            self.assertTrue(np.array_equal(BIDSLoader.load_packed_image(image, cache_dir=cache_dir),
+                                           np.packbits(np.ones(27, dtype=bool))))
+            # Replace the image with different data and an older timestamp, as extracting an archive would
+            nib.save(nib.Nifti1Image(np.zeros((3, 3, 3), dtype=np.uint8), np.eye(4)), image_path)
+            os.utime(image_path, (0, 0))
+            self.assertTrue(np.array_equal(BIDSLoader.load_packed_image(image, cache_dir=cache_dir),
+                                           np.packbits(np.zeros(27, dtype=bool))))
+        return
@@ -1,8 +1,41 @@
 from scoring import DiceCoeff
+import scoring
 import unittest
+from unittest import mock
 import numpy as np
 
 
+class _FakeDeviceArray(np.ndarray):
+    '''
+    numpy-backed stand-in for cupy.ndarray.
+    '''
+    pass
+
+
+class _FakeCupy():
+    '''
+    Minimal numpy-backed stand-in for the parts of cupy used by DiceCoeff. Reductions return numpy scalars, which
+    provide .item() like cupy's 0-dimensional arrays.
+    '''
+    ndarray = _FakeDeviceArray
+
+    @staticmethod
+    def asarray(array_0):
+        return np.asarray(array_0).view(_FakeDeviceArray)
+
+    @staticmethod
+    def ravel(array_0):
+        return np.ravel(array_0)
+
+    @staticmethod
+    def count_nonzero(array_0):
+        return np.int64(np.count_nonzero(array_0))
+
+    @staticmethod
+    def sum(array_0):
+        return np.sum(array_0)
+
+
 class TestDiceCoeff(unittest.TestCase):
     def test_dicecoeff_init(self):
         dice = DiceCoeff()
@@ -68,3 +101,108 @@ class TestDiceCoeff(unittest.TestCase):
         # While we're here; test the call
         # self.assertEqual(dice(array_fizz_image, array_buzz_image), expected_coef)
         return
+
+    def test_dicecoeff_score_bool(self):
+        dice = DiceCoeff()
+        array_fizz = np.zeros((10**3), dtype=bool)
+        array_buzz = np.zeros((10**3), dtype=bool)
+        array_fizz[slice(0, None, 3)] = 1
+        array_buzz[slice(0, None, 5)] = 1
+        array_fizz_image = np.reshape(array_fizz, (10, 10, 10))
+        array_buzz_image = np.reshape(array_buzz, (10, 10, 10))
+        # Binary masks should give the same coefficient as their float counterparts
+        expected_coef = dice.calc_score(np.array(array_fizz_image, dtype=float),
+                                        np.array(array_buzz_image, dtype=float))
+        self.assertEqual(dice.calc_score(array_fizz_image, array_buzz_image), expected_coef)
+        return
+
+    def test_dicecoeff_score_empty(self):
+        dice = DiceCoeff()
+        array_0 = np.zeros((10, 9, 8), dtype=bool)
+        array_1 = np.zeros((10, 9, 8), dtype=bool)
+        self.assertEqual(dice.calc_score(array_0, array_1), 1.0)
+        array_1[0, 0, 0] = 1
+        self.assertEqual(dice.calc_score(array_0, array_1), 0.0)
+        return
+
+    def test_dicecoeff_check_binary(self):
+        dice = DiceCoeff()
+        array_0 = np.zeros((10, 9, 8), dtype=np.uint8)
+        array_0[0, 0, 0] = 1
+        self.assertTrue(dice.check_binary_mask(array_0))
+        self.assertTrue(dice.check_binary_mask(array_0.astype(bool)))
+        self.assertTrue(dice.check_binary_mask(array_0.astype(np.int16)))
+        self.assertFalse(dice.check_binary_mask(array_0.astype(float)))
+        array_0[0, 0, 1] = 2
+        self.assertFalse(dice.check_binary_mask(array_0))
+        self.assertFalse(dice.check_binary_mask(-array_0.astype(np.int16)))
+        return
+
+    def test_dicecoeff_score_uint8(self):
+        dice = DiceCoeff()
+        # More than 255 overlapping voxels; uint8 accumulation would overflow
+        array_0 = np.ones((10, 10, 10), dtype=np.uint8)
+        array_1 = np.ones((10, 10, 10), dtype=np.uint8)
+        self.assertEqual(dice.calc_score(array_0, array_1), 1.0)
+        return
+
+    def test_dicecoeff_unpack(self):
+        dice = DiceCoeff()
+        for shape in [(10, 9, 8), (3, 3, 3)]:
+            array_0 = np.zeros(shape, dtype=bool)
+            array_0[slice(0, None, 2), 1, :] = 1
+            unpacked = dice.unpack_data(np.packbits(array_0), shape)
+            self.assertEqual(unpacked.shape, shape)
+            self.assertEqual(unpacked.dtype, np.uint8)
+            self.assertTrue(np.array_equal(unpacked.view(bool), array_0))
+        return
+
+    def test_dicecoeff_score_uint8_nonbinary(self):
+        dice = DiceCoeff()
+        # Non-binary labels take the dot product path; the overlap (2 * 2 * 1000) doesn't fit in uint8
+        array_0 = np.full((10, 10, 10), 2, dtype=np.uint8)
+        array_1 = np.ones((10, 10, 10), dtype=np.uint8)
+        overlap, sum0, sum1 = dice.calc_score_parts(array_0, array_1)
+        self.assertEqual(overlap, 4000)
+        self.assertEqual(sum0, 2000)
+        self.assertEqual(sum1, 1000)
+        overlap, _, _ = dice.calc_score_parts(array_0.astype(np.int16), array_1.astype(bool))
+        self.assertEqual(overlap, 4000)
+        return
+
+    def test_dicecoeff_score_gpu(self):
+        dice = DiceCoeff()
+        array_fizz = np.zeros((10, 10, 10), dtype=bool)
+        array_buzz = np.zeros((10, 10, 10), dtype=bool)
+        array_fizz.ravel()[slice(0, None, 3)] = 1
+        array_buzz.ravel()[slice(0, None, 5)] = 1
+        array_empty = np.zeros((10, 10, 10), dtype=bool)
+        test_pairs = [(array_fizz, array_buzz),  # bool branch
+                      (np.array(array_fizz, dtype=np.float32), array_buzz),  # non-bool branch
+                      (np.full((10, 10, 10), 16, dtype=np.uint8), np.full((10, 10, 10), 16, dtype=np.uint8)),
+                      (np.array(array_fizz, dtype=np.uint8) * 2, array_buzz),  # integer labels
+                      (array_empty, array_empty),
+                      (np.array(array_empty, dtype=np.float32), array_empty)]
+        with mock.patch.object(scoring, 'cupy', _FakeCupy):
+            for array_0, array_1 in test_pairs:
+                device_array_0 = _FakeCupy.asarray(array_0)
+                self.assertEqual(dice.calc_score_parts(device_array_0, array_1),
+                                 dice.calc_score_parts(array_0, array_1))
+                self.assertEqual(dice.calc_score(device_array_0, array_1), dice.calc_score(array_0, array_1))
+        self.assertEqual(dice.calc_score(array_empty, array_empty), 1.0)
+        return
+
+    def test_dicecoeff_score_parts_no_numba(self):
+        dice = DiceCoeff()
+        rng = np.random.RandomState(0)
+        array_0 = rng.rand(20, 30, 40) > 0.7
+        array_1 = np.array(rng.rand(20, 30, 40) > 0.5, dtype=np.uint8)
+        expected_parts = (2 * np.sum(array_0 & (array_1 == 1)), np.sum(array_0), np.sum(array_1))
+        kernel_parts = dice.calc_score_parts(array_0, array_1)
+        # Without numba, the NumPy reductions should give the same parts as the kernel
+        with mock.patch.object(scoring, '_dice_kernel', None):
+            fallback_parts = dice.calc_score_parts(array_0, array_1)
+            self.assertEqual(dice.calc_score_parts(array_0, np.zeros_like(array_1)), (0, np.sum(array_0), 0))
+        self.assertEqual(kernel_parts, expected_parts)
+        self.assertEqual(fallback_parts, expected_parts)
+        return
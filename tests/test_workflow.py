@@ -0,0 +1,90 @@
+from bids_workflow import BIDSWorkflow
+from bids_loader import BIDSLoader
+from stroke import stroke_config
+import unittest
+from unittest import mock
+import os
+import tempfile
+import numpy as np
+import bids
+bids.config.set_option(
+    'extension_initial_dot',
+    True)  # bids warning suppression
+
+# Estimator that records the batches it is given
+stub_estimator = """
+class BIDSEstimator():
+    def __init__(self):
+        self.batches = []
+
+    def fit_partial(self, X, y):
+        self.batches.append((X, y))
+"""
+
+
+class TestBIDSWorkflow(unittest.TestCase):
+    def setUp(self):
+        self.module_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.module_dir.name, 'estimator.py'), 'w') as f:
+            f.write(stub_estimator)
+        return
+
+    def tearDown(self):
+        self.module_dir.cleanup()
+        return
+
+    def _train_indices(self, X_array, train_is=None, batch_size=3):
+        '''
+        Trains the stub estimator, loading only the indices of each batch. Returns the batches it received and the
+        batches that were loaded.
+        '''
+        loaded_batches = []
+
+        def load_batch(X, y, batch_is):
+            loaded_batches.append(list(batch_is))
+            return list(batch_is), None
+
+        workflow = BIDSWorkflow()
+        with mock.patch.dict(stroke_config.training, {'batch_size': batch_size}), \
+                mock.patch.object(BIDSWorkflow, '_load_batch', staticmethod(load_batch)):
+            estimator = workflow.train_submission(self.module_dir.name, X_array, X_array, train_is=train_is)
+        return [X for X, _ in estimator.batches], loaded_batches
+
+    def test_train_default_indices(self):
+        batches, loaded_batches = self._train_indices(list(range(7)))
+        self.assertEqual(batches, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(loaded_batches, batches)
+        return
+
+    def test_train_batch_order(self):
+        batches, loaded_batches = self._train_indices(list(range(7)), train_is=[5, 2, 6, 0])
+        self.assertEqual(batches, [[5, 2, 6], [0]])
+        self.assertEqual(loaded_batches, batches)
+        return
+
+    def test_train_empty(self):
+        batches, loaded_batches = self._train_indices(list(range(7)), train_is=[])
+        self.assertEqual(batches, [])
+        # Nothing should be loaded; loading an empty batch fails
+        self.assertEqual(loaded_batches, [])
+        return
+
+    def test_train_bids(self):
+        test_dir = os.path.dirname(__file__)
+        root_dir = os.path.join(test_dir, 'bids_sample/train')
+        bdc = BIDSLoader(root_dir=root_dir,
+                         data_entities=[{'suffix': 'T1w',
+                                         'session': '',
+                                         'subject': ''}],
+                         target_entities=[{'suffix': 'FLAIR'}],
+                         target_derivatives_names=['test1'])
+        workflow = BIDSWorkflow()
+        with mock.patch.dict(stroke_config.training, {'batch_size': 3}), \
+                mock.patch.object(stroke_config, 'cache_dir', None):
+            estimator = workflow.train_submission(self.module_dir.name, bdc.data_list, bdc.target_list)
+        self.assertEqual(len(bdc.data_list), 4)
+        self.assertEqual([X.shape[0] for X, _ in estimator.batches], [3, 1])
+        self.assertEqual([y.shape[0] for _, y in estimator.batches], [3, 1])
+        expected_data = BIDSLoader.load_image_tuple_list(bdc.data_list[3:])
+        self.assertTrue(np.array_equal(estimator.batches[-1][0], expected_data))
+        return